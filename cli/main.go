@@ -156,7 +156,7 @@ func runLogin(app *App) {
 }
 
 func initMessageDB() (*sql.DB, error) {
-	db, err := sql.Open("sqlite3", "file:messages.db?_foreign_keys=on")
+	db, err := sql.Open("sqlite3", "file:messages.db?_foreign_keys=on&_journal_mode=WAL&_synchronous=NORMAL")
 	if err != nil {
 		return nil, err
 	}
@@ -1,15 +1,30 @@
 import asyncio
-import json
+import socket
 import sqlite3
 
+import orjson
 import pyperclip
 from textual.app import App, ComposeResult
 from textual.binding import Binding
+from textual.timer import Timer
 from textual.widgets import Footer, Header, Input
 
-from tui.models import Call, Entry, Message
-from tui.utils import DB_PATH, SOCKET_PATH, log
-from tui.widgets import ComposeInput, EntryWidget, MessageList
+from tui.models import ENTRY_TYPES, Call, Entry, Message, entry_from_event
+from tui.utils import DB_PATH, SOCKET_PATH, logger
+from tui.widgets import ComposeInput, MessageList
+
+HISTORY_QUERY = """
+    SELECT 0 AS kind, id, timestamp, message_id, chat_jid, chat_name, sender_jid,
+        sender_name, is_group, is_muted, is_reply_to_me, text
+    FROM messages WHERE (timestamp, 0, id) < (?1, ?2, ?3)
+    UNION ALL
+    SELECT 1, id, timestamp, call_id, caller_jid, caller_name, is_group,
+        group_jid, group_name, NULL, NULL, NULL
+    FROM calls WHERE (timestamp, 1, id) < (?1, ?2, ?3)
+    ORDER BY timestamp DESC, kind DESC, id DESC
+    LIMIT ?4
+"""
+NEWEST = (2**63 - 1, 0, 0)
 
 
 class WaCLIApp(App):
@@ -43,12 +58,24 @@ class WaCLIApp(App):
     ]
 
     HALF_PAGE = 15
+    HISTORY_PAGE = 1000
+    RECV_BUFFER_SIZE = 64 * 1024
+    FLUSH_INTERVAL = 0.016
+    FLUSH_BATCH = 32
 
     def __init__(self) -> None:
         super().__init__()
         self.entries: list[Entry] = []
+        self._db: sqlite3.Connection | None = None
+        self._history_cursor: tuple[int, int, int] = NEWEST
+        self._has_more_history = False
+        self._loading_history = False
+        self._pending: list[Entry] = []
+        self._flush_timer: Timer | None = None
+        self._pending_delta = 0
+        self._selection_timer: Timer | None = None
         self.selected_index: int = -1
-        self.socket_writer: asyncio.StreamWriter | None = None
+        self.socket: socket.socket | None = None
         self.compose_mode: str | None = None
 
     def compose(self) -> ComposeResult:
@@ -58,165 +85,187 @@ class WaCLIApp(App):
         yield Footer()
 
     async def on_mount(self) -> None:
-        log("on_mount: start")
+        logger.debug("on_mount: start")
         self.title = "WhatsApp Messages"
-        self.load_entries_from_db()
+        self._message_list = self.query_one(MessageList)
+        self._compose_input = self.query_one(ComposeInput)
+        logger.debug("on_mount: starting worker")
+        self.run_worker(self.load_and_listen(), exclusive=True)
+
+    def on_unmount(self) -> None:
+        if self._db is not None:
+            self._db.close()
+
+    async def load_and_listen(self) -> None:
+        await asyncio.to_thread(self.load_entries_from_db)
         self.render_entries()
-        log("on_mount: starting worker")
-        self.run_worker(self.listen_socket(), exclusive=True)
+        await self.listen_socket()
 
     def load_entries_from_db(self) -> None:
         if not DB_PATH.exists():
             return
 
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        messages: list[Entry] = []
-        cursor.execute("SELECT * FROM messages")
-        for row in cursor.fetchall():
-            messages.append(
-                Message(
-                    id=row["id"],
-                    message_id=row["message_id"],
-                    timestamp=row["timestamp"],
-                    chat_jid=row["chat_jid"],
-                    chat_name=row["chat_name"],
-                    sender_jid=row["sender_jid"],
-                    sender_name=row["sender_name"],
-                    is_group=bool(row["is_group"]),
-                    is_muted=bool(row["is_muted"]),
-                    is_reply_to_me=bool(row["is_reply_to_me"]),
-                    text=row["text"],
-                )
-            )
-
-        calls: list[Entry] = []
-        cursor.execute("SELECT * FROM calls")
-        for row in cursor.fetchall():
-            calls.append(
-                Call(
-                    id=row["id"],
-                    timestamp=row["timestamp"],
-                    call_id=row["call_id"],
-                    caller_jid=row["caller_jid"],
-                    caller_name=row["caller_name"],
-                    is_group=bool(row["is_group"]),
-                    group_jid=row["group_jid"],
-                    group_name=row["group_name"],
-                )
-            )
-
-        conn.close()
-        self.entries = sorted(messages + calls, key=lambda e: e.timestamp)
+        # Opened in a worker thread, then only used from the event loop.
+        self._db = sqlite3.connect(DB_PATH, check_same_thread=False)
+        self._db.execute("PRAGMA cache_size = -20000")
+        self._db.execute("PRAGMA temp_store = MEMORY")
+        self._db.execute("PRAGMA mmap_size = 268435456")
+        self._history_cursor = NEWEST
+        self.entries = self.load_history_page()
+
+    def load_history_page(self) -> list[Entry]:
+        assert self._db is not None
+        rows = self._db.execute(HISTORY_QUERY, (*self._history_cursor, self.HISTORY_PAGE))
+        entries = [Message(*row[1:]) if row[0] == 0 else Call(*row[1:9]) for row in rows]
+        entries.reverse()
+        self._has_more_history = len(entries) == self.HISTORY_PAGE
+        if entries:
+            oldest = entries[0]
+            self._history_cursor = (oldest.timestamp, 1 if oldest.IS_CALL else 0, oldest.id)
+        return entries
+
+    def request_older_entries(self) -> None:
+        if self._has_more_history and not self._loading_history:
+            self._loading_history = True
+            self.run_worker(self.load_older_entries(), group="history")
+
+    async def load_older_entries(self) -> None:
+        try:
+            older = await asyncio.to_thread(self.load_history_page)
+        finally:
+            self._loading_history = False
+        if not older:
+            return
+        self.entries[:0] = older
+        self.selected_index += len(older)
+        self._message_list.entries_prepended(len(older))
+        logger.debug("load_older_entries: loaded %d entries", len(older))
 
     def render_entries(self) -> None:
-        message_list = self.query_one(MessageList)
-        message_list.remove_children()
         if self.entries:
             self.selected_index = len(self.entries) - 1
-        for i, entry in enumerate(self.entries):
-            message_list.mount(EntryWidget(entry, selected=(i == self.selected_index)))
-        self.call_after_refresh(self.scroll_to_selected)
-
-    def scroll_to_selected(self) -> None:
-        widgets = self.query(EntryWidget)
-        if widgets and 0 <= self.selected_index < len(widgets):
-            widgets[self.selected_index].scroll_visible()
+        self._message_list.reset()
 
     def update_selection(self, new_index: int) -> None:
         if not self.entries:
             return
+        if new_index < self.HALF_PAGE:
+            self.request_older_entries()
         new_index = max(0, min(new_index, len(self.entries) - 1))
         if new_index == self.selected_index:
             return
-        widgets = list(self.query(EntryWidget))
-        if 0 <= self.selected_index < len(widgets):
-            widgets[self.selected_index].remove_class("selected")
-            widgets[self.selected_index].refresh()
+        old_widget = self._message_list.widget_at(self.selected_index)
+        if old_widget:
+            old_widget.set_selected(False)
         self.selected_index = new_index
-        widgets[self.selected_index].add_class("selected")
-        widgets[self.selected_index].refresh()
-        widgets[self.selected_index].scroll_visible()
+        self._message_list.show_index(new_index)
+        widget = self._message_list.widget_at(new_index)
+        if widget:
+            widget.set_selected(True)
 
     async def listen_socket(self) -> None:
-        log("listen_socket: connecting...")
-        reader, writer = await asyncio.open_unix_connection(SOCKET_PATH)
-        self.socket_writer = writer
-        log("listen_socket: connected")
+        logger.debug("listen_socket: connecting...")
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        await loop.sock_connect(sock, SOCKET_PATH)
+        self.socket = sock
+        logger.debug("listen_socket: connected")
+        buf = bytearray(self.RECV_BUFFER_SIZE)
+        view = memoryview(buf)
+        end = 0
         while True:
-            line = await reader.readline()
-            log(f"listen_socket: got line: {line}")
-            if not line:
+            if end == len(buf):
+                grown = bytearray(len(buf) * 2)
+                grown[:end] = buf
+                buf, view = grown, memoryview(grown)
+            n = await loop.sock_recv_into(sock, view[end:])
+            if not n:
                 raise ConnectionError("Socket connection closed")
-            event = json.loads(line.decode())
-            entry_type = event["type"]
-            data = event["data"]
-            entry: Entry
-            if entry_type == "call":
-                entry = Call(
-                    id=data.get("id", 0),
-                    timestamp=data["timestamp"],
-                    call_id=data["call_id"],
-                    caller_jid=data["caller_jid"],
-                    caller_name=data["caller_name"],
-                    is_group=data["is_group"],
-                    group_jid=data["group_jid"],
-                    group_name=data["group_name"],
-                )
-                log(f"listen_socket: parsed call from {entry.caller_name}")
-            elif entry_type == "message":
-                entry = Message(
-                    id=data.get("id", 0),
-                    message_id=data.get("message_id", ""),
-                    timestamp=data["timestamp"],
-                    chat_jid=data["chat_jid"],
-                    chat_name=data["chat_name"],
-                    sender_jid=data["sender_jid"],
-                    sender_name=data["sender_name"],
-                    is_group=data["is_group"],
-                    is_muted=data["is_muted"],
-                    is_reply_to_me=data["is_reply_to_me"],
-                    text=data["text"],
-                )
-                log(f"listen_socket: parsed message: {entry.text}")
-            else:
-                raise ValueError(f"Unexpected entry type: {entry_type}")
-            self.entries.append(entry)
-            message_list = self.query_one(MessageList)
-            was_at_end = self.selected_index == len(self.entries) - 2
-            message_list.mount(EntryWidget(entry, selected=was_at_end))
-            if was_at_end:
-                self.update_selection(len(self.entries) - 1)
-            log("listen_socket: widget mounted")
+            scan = end
+            end += n
+            start = 0
+            while (newline := buf.find(b"\n", scan, end)) != -1:
+                self.handle_socket_line(view[start:newline])
+                start = scan = newline + 1
+            if start:
+                view[: end - start] = view[start:end]
+                end -= start
+
+    def handle_socket_line(self, line: memoryview) -> None:
+        event = orjson.loads(line)
+        logger.debug("listen_socket: got event: %s", event)
+        entry_type = event["type"]
+        entry_cls = ENTRY_TYPES.get(entry_type)
+        if entry_cls is None:
+            raise ValueError(f"Unexpected entry type: {entry_type}")
+        entry = entry_from_event(entry_cls, event["data"])
+        logger.debug("listen_socket: parsed %s from %s", entry_type, entry.title)
+        self._pending.append(entry)
+        if len(self._pending) >= self.FLUSH_BATCH:
+            self.flush_pending()
+        elif self._flush_timer is None:
+            self._flush_timer = self.set_timer(self.FLUSH_INTERVAL, self.flush_pending)
+
+    def flush_pending(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+            self._flush_timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        was_at_end = self.selected_index == len(self.entries) - 1
+        self.entries.extend(pending)
+        self._message_list.sync_window()
+        if was_at_end:
+            self.update_selection(len(self.entries) - 1)
+        logger.debug("flush_pending: added %d entries", len(pending))
+
+    def move_selection(self, delta: int) -> None:
+        # Clamp per step so presses past either end don't bank movement.
+        lowest = -self.selected_index
+        highest = len(self.entries) - 1 - self.selected_index
+        self._pending_delta = max(lowest, min(self._pending_delta + delta, highest))
+        if self._selection_timer is None:
+            self._selection_timer = self.set_timer(self.FLUSH_INTERVAL, self.flush_selection)
+
+    def flush_selection(self) -> None:
+        if self._selection_timer is not None:
+            self._selection_timer.stop()
+            self._selection_timer = None
+        delta, self._pending_delta = self._pending_delta, 0
+        if delta:
+            self.update_selection(self.selected_index + delta)
 
     def action_select_next(self) -> None:
-        self.update_selection(self.selected_index + 1)
+        self.move_selection(1)
 
     def action_select_prev(self) -> None:
-        self.update_selection(self.selected_index - 1)
+        self.move_selection(-1)
 
     def action_select_first(self) -> None:
+        self.flush_selection()
         self.update_selection(0)
 
     def action_select_last(self) -> None:
+        self.flush_selection()
         self.update_selection(len(self.entries) - 1)
 
     def action_half_page_down(self) -> None:
-        self.update_selection(self.selected_index + self.HALF_PAGE)
+        self.move_selection(self.HALF_PAGE)
 
     def action_half_page_up(self) -> None:
-        self.update_selection(self.selected_index - self.HALF_PAGE)
+        self.move_selection(-self.HALF_PAGE)
 
-    def action_copy_message(self) -> None:
+    async def action_copy_message(self) -> None:
         entry = self.get_selected_entry()
-        if not entry or isinstance(entry, Call):
+        if not entry or entry.IS_CALL:
             return
-        pyperclip.copy(entry.text)
+        await asyncio.to_thread(pyperclip.copy, entry.text)
         self.notify("Copied to clipboard")
 
     def get_selected_entry(self) -> Entry | None:
+        self.flush_selection()
         if 0 <= self.selected_index < len(self.entries):
             return self.entries[self.selected_index]
         return None
@@ -225,10 +274,10 @@ class WaCLIApp(App):
         entry = self.get_selected_entry()
         if not entry:
             return
-        if isinstance(entry, Call):
+        if entry.IS_CALL:
             return
         self.compose_mode = "send"
-        compose_input = self.query_one(ComposeInput)
+        compose_input = self._compose_input
         compose_input.placeholder = f"Message to {entry.chat_name}..."
         compose_input.add_class("visible")
         compose_input.focus()
@@ -237,16 +286,16 @@ class WaCLIApp(App):
         entry = self.get_selected_entry()
         if not entry:
             return
-        if isinstance(entry, Call):
+        if entry.IS_CALL:
             return
         self.compose_mode = "reply"
-        compose_input = self.query_one(ComposeInput)
+        compose_input = self._compose_input
         compose_input.placeholder = f"Reply to {entry.sender_name}..."
         compose_input.add_class("visible")
         compose_input.focus()
 
     def hide_compose(self) -> None:
-        compose_input = self.query_one(ComposeInput)
+        compose_input = self._compose_input
         compose_input.value = ""
         compose_input.remove_class("visible")
         self.compose_mode = None
@@ -258,11 +307,11 @@ class WaCLIApp(App):
             return
 
         entry = self.get_selected_entry()
-        if not entry or isinstance(entry, Call):
+        if not entry or entry.IS_CALL:
             self.hide_compose()
             return
 
-        if not self.socket_writer:
+        if not self.socket:
             self.notify("Not connected to socket", severity="error")
             self.hide_compose()
             return
@@ -285,7 +334,8 @@ class WaCLIApp(App):
             self.hide_compose()
             return
 
-        log(f"Sending: {payload}")
-        self.socket_writer.write((json.dumps(payload) + "\n").encode())
-        await self.socket_writer.drain()
+        logger.debug("Sending: %s", payload)
+        loop = asyncio.get_running_loop()
+        frame = orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+        await loop.sock_sendall(self.socket, frame)
         self.hide_compose()
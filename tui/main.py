@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
+import asyncio
 import sys
 from pathlib import Path
 
+import uvloop
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from tui.app import WaCLIApp
 
 
 def main() -> None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     app = WaCLIApp()
     app.run()
 
@@ -1,53 +1,125 @@
-from dataclasses import dataclass
-from datetime import datetime
+import sys
+import time
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 
+from textual.content import Content
 
-@dataclass
+PREVIEW_LENGTH = 256
+
+
+def format_time(timestamp: int) -> str:
+    return _format_minute(timestamp // 60)
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute: int) -> str:
+    lt = time.localtime(minute * 60)
+    return f"{lt.tm_hour:02d}:{lt.tm_min:02d}"
+
+
+@dataclass(slots=True, frozen=True)
 class Message:
+    IS_CALL = False
+
     id: int
-    message_id: str
     timestamp: int
+    message_id: str
     chat_jid: str
     chat_name: str
     sender_jid: str
     sender_name: str
-    is_group: bool
-    is_muted: bool
-    is_reply_to_me: bool
+    is_group: int
+    is_muted: int
+    is_reply_to_me: int
     text: str
+    formatted_time: str = field(init=False)
+    title: str = field(init=False)
+    preview: str = field(init=False)
+    content: Content = field(init=False)
 
-    @property
-    def formatted_time(self) -> str:
-        dt = datetime.fromtimestamp(self.timestamp)
-        return dt.strftime("%H:%M")
-
-    @property
-    def title(self) -> str:
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "chat_jid", sys.intern(self.chat_jid))
+        object.__setattr__(self, "sender_jid", sys.intern(self.sender_jid))
+        object.__setattr__(self, "formatted_time", format_time(self.timestamp))
         prefix = "↩ " if self.is_reply_to_me else ""
-        return f"{prefix}{self.sender_name}"
+        object.__setattr__(self, "title", f"{prefix}{self.sender_name}")
+        preview = self.text
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH] + "..."
+        if "\n" in preview:
+            preview = preview.replace("\n", " ")
+        object.__setattr__(self, "preview", preview)
+        if self.is_group:
+            content = Content.assemble(
+                (self.formatted_time, "dim"),
+                (f" {self.title} ", "bold cyan"),
+                ("👥", "bold magenta"),
+                (" ", "bold cyan"),
+                (self.chat_name, "bold magenta"),
+                ": ",
+                self.preview,
+            )
+        else:
+            content = Content.assemble(
+                (self.formatted_time, "dim"),
+                (f" {self.title}", "bold cyan"),
+                ": ",
+                self.preview,
+            )
+        object.__setattr__(self, "content", content)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Call:
+    IS_CALL = True
+
     id: int
     timestamp: int
     call_id: str
     caller_jid: str
     caller_name: str
-    is_group: bool
+    is_group: int
     group_jid: str
     group_name: str
+    formatted_time: str = field(init=False)
+    title: str = field(init=False)
+    content: Content = field(init=False)
 
-    @property
-    def formatted_time(self) -> str:
-        dt = datetime.fromtimestamp(self.timestamp)
-        return dt.strftime("%H:%M")
-
-    @property
-    def title(self) -> str:
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "caller_jid", sys.intern(self.caller_jid))
+        object.__setattr__(self, "formatted_time", format_time(self.timestamp))
         if self.is_group and self.group_name:
-            return f"{self.caller_name} @ {self.group_name}"
-        return self.caller_name
+            object.__setattr__(self, "title", f"{self.caller_name} @ {self.group_name}")
+        else:
+            object.__setattr__(self, "title", self.caller_name)
+        content = Content.assemble(
+            (self.formatted_time, "dim"),
+            (f" 📞 {self.title}", "bold yellow"),
+            ": Incoming call",
+        )
+        object.__setattr__(self, "content", content)
 
 
 Entry = Message | Call
+
+ENTRY_TYPES: dict[str, type[Message] | type[Call]] = {
+    "message": Message,
+    "call": Call,
+}
+
+# Socket events may carry keys the TUI does not know about; only these are read.
+_EVENT_FIELDS: dict[type[Message] | type[Call], tuple[str, ...]] = {
+    cls: tuple(f.name for f in fields(cls) if f.init) for cls in (Message, Call)
+}
+_EVENT_DEFAULTS: dict[type[Message] | type[Call], dict[str, object]] = {
+    Message: {"id": 0, "message_id": ""},
+    Call: {"id": 0},
+}
+
+
+def entry_from_event(entry_cls: type[Message] | type[Call], data: dict) -> Entry:
+    defaults = _EVENT_DEFAULTS[entry_cls]
+    return entry_cls(
+        *[data[name] if name in data else defaults[name] for name in _EVENT_FIELDS[entry_cls]]
+    )
@@ -1,4 +1,9 @@
-from datetime import datetime
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import time
 from pathlib import Path
 
 RUNTIME_DIR = Path("/tmp/rlocal/wacli")
@@ -10,6 +15,48 @@ SOCKET_PATH = str(RUNTIME_DIR / "wacli.sock")
 DB_PATH = Path(__file__).parent.parent / "cli" / "messages.db"
 
 
-def log(msg: str) -> None:
-    with open(LOG_FILE, "a") as f:
-        f.write(f"{datetime.now().isoformat()} {msg}\n")
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler that leaves flushing to the file buffer and logging.shutdown()."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class _SecondCachedFormatter(logging.Formatter):
+    """Formatter that reuses the asctime prefix for records in the same second."""
+
+    def __init__(self, fmt: str) -> None:
+        super().__init__(fmt)
+        self._cached_second = -1
+        self._cached_prefix = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_prefix = time.strftime(self.default_time_format, self.converter(second))
+        return self.default_msec_format % (self._cached_prefix, record.msecs)
+
+
+_debug = bool(os.environ.get("WACLI_DEBUG"))
+
+logger = logging.getLogger("wacli")
+logger.setLevel(logging.DEBUG if _debug else logging.WARNING)
+logger.propagate = False
+
+_log_handler = _BufferedFileHandler(LOG_FILE, delay=True)
+_log_handler.setFormatter(_SecondCachedFormatter("%(asctime)s %(message)s"))
+if _debug:
+    # File writes happen on the listener's thread so the event loop never waits on disk.
+    _log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+else:
+    logger.addHandler(_log_handler)
@@ -1,10 +1,13 @@
 from typing import TYPE_CHECKING
 
+from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import ScrollableContainer
+from textual.content import Content
+from textual.widget import Widget
 from textual.widgets import Input, Static
 
-from tui.models import Call, Entry, Message
+from tui.models import Entry
 
 if TYPE_CHECKING:
     from tui.app import WaCLIApp
@@ -25,26 +28,124 @@ class EntryWidget(Static):
 
     def __init__(self, entry: Entry, selected: bool = False) -> None:
         self.entry = entry
-        super().__init__()
-        if selected:
-            self.add_class("selected")
-
-    def render(self) -> str:
-        indicator = ">" if self.has_class("selected") else " "
-        if isinstance(self.entry, Message):
-            msg = self.entry
-            text_oneline = msg.text.replace("\n", " ")
-            if msg.is_group:
-                title = f"{msg.title} [bold magenta]👥[/] [magenta]{msg.chat_name}[/]"
-            else:
-                title = msg.title
-            return f"{indicator} [dim]{msg.formatted_time}[/][bold cyan] {title}[/]: {text_oneline}"
-        call = self.entry
-        return f"{indicator} [dim]{call.formatted_time}[/][bold yellow] 📞 {call.title}[/]: Incoming call"
+        self._selected = selected
+        self._rendered: dict[bool, Content] = {}
+        super().__init__(classes="selected" if selected else None)
+
+    def set_selected(self, selected: bool) -> None:
+        self._selected = selected
+        self.set_class(selected, "selected")
+
+    def render(self) -> Content:
+        selected = self._selected
+        rendered = self._rendered.get(selected)
+        if rendered is None:
+            indicator = "> " if selected else "  "
+            rendered = self._rendered[selected] = indicator + self.entry.content
+        return rendered
 
 
 class MessageList(ScrollableContainer):
-    pass
+    OVERSCAN = 20
+
+    app: "WaCLIApp"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._top_spacer = Widget()
+        self._bottom_spacer = Widget()
+        self._rows: list[EntryWidget] = []
+        self._start = 0
+        self._top = 0
+
+    def compose(self) -> ComposeResult:
+        yield self._top_spacer
+        yield self._bottom_spacer
+
+    def viewport_height(self) -> int:
+        return self.scrollable_content_region.height or self.app.size.height
+
+    def reset(self) -> None:
+        self.remove_children(self._rows)
+        self._rows = []
+        self._start = 0
+        self._top = max(0, len(self.app.entries) - self.viewport_height())
+        self.sync_window()
+        self.scroll_to(y=self._top, animate=False)
+
+    def widget_at(self, index: int) -> EntryWidget | None:
+        offset = index - self._start
+        if 0 <= offset < len(self._rows):
+            return self._rows[offset]
+        return None
+
+    def show_index(self, index: int) -> None:
+        height = self.viewport_height()
+        top = self._top
+        if index < top:
+            top = index
+        elif index >= top + height:
+            top = index - height + 1
+        if top != self._top:
+            self._top = top
+            self.sync_window()
+            if top < self.OVERSCAN:
+                self.app.request_older_entries()
+            self.scroll_to(y=top, animate=False)
+
+    def entries_prepended(self, count: int) -> None:
+        self._start += count
+        self._top += count
+        self.sync_window()
+        self.scroll_to(y=self._top, animate=False)
+
+    def sync_window(self) -> None:
+        entries = self.app.entries
+        start = max(0, self._top - self.OVERSCAN)
+        end = min(len(entries), self._top + self.viewport_height() + self.OVERSCAN)
+        start = min(start, end)
+        rows = self._rows
+        old_start, old_end = self._start, self._start + len(rows)
+        if start >= old_end or end <= old_start:
+            self.remove_children(rows)
+            rows = self.make_rows(start, end)
+            if rows:
+                self.mount_all(rows, before=self._bottom_spacer)
+        else:
+            drop_front = max(0, start - old_start)
+            drop_back = max(0, old_end - end)
+            kept = rows[drop_front : len(rows) - drop_back]
+            dropped = rows[:drop_front] + rows[len(rows) - drop_back :]
+            if dropped:
+                self.remove_children(dropped)
+            head = self.make_rows(start, old_start)
+            tail = self.make_rows(old_end, end)
+            if head:
+                self.mount_all(head, after=self._top_spacer)
+            if tail:
+                self.mount_all(tail, before=self._bottom_spacer)
+            rows = head + kept + tail
+        self._rows = rows
+        self._start = start
+        self._top_spacer.styles.height = start
+        self._bottom_spacer.styles.height = len(entries) - end
+
+    def make_rows(self, start: int, end: int) -> list[EntryWidget]:
+        entries = self.app.entries
+        selected = self.app.selected_index
+        return [EntryWidget(entries[i], selected=(i == selected)) for i in range(start, end)]
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        top = round(new_value)
+        if top != self._top:
+            self._top = top
+            self.sync_window()
+            if top < self.OVERSCAN:
+                self.app.request_older_entries()
+
+    def on_resize(self) -> None:
+        self.sync_window()
 
 
 class ComposeInput(Input):